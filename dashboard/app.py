@@ -1,26 +1,206 @@
 import dash
 from dash import dcc, html, Input, Output, State, dash_table
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objs as go
 import dash_bootstrap_components as dbc
+import io
 import os
 from datetime import datetime, timedelta
+from functools import lru_cache
+
+try:
+    from numba import njit
+except ImportError:
+    # Without numba the kernels run as plain Python; correct, just slow.
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+# Background-callback manager so the dashboard render runs on a job
+# queue instead of tying up a web worker per connected client. Celery
+# with a shared Redis broker when REDIS_URL is set (multi-worker
+# deployments), diskcache locally; without either the callback just
+# runs synchronously as before.
+if 'REDIS_URL' in os.environ:
+    from celery import Celery
+    from dash import CeleryManager
+    celery_app = Celery(__name__, broker=os.environ['REDIS_URL'],
+                        backend=os.environ['REDIS_URL'])
+    background_callback_manager = CeleryManager(celery_app)
+else:
+    try:
+        import diskcache
+        from dash import DiskcacheManager
+        background_callback_manager = DiskcacheManager(diskcache.Cache("./cache"))
+    except ImportError:
+        background_callback_manager = None
 
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.LUX])
 app.title = "Real-Time Fraud Detection"
 
 DATA_FILE = 'results/predictions.csv'
 
+# High-fraud alert: trailing window size (rows) and rate threshold.
+ALERT_WINDOW = 200
+ALERT_THRESHOLD = 0.3
+
+# Narrow dtypes halve the bytes every downstream groupby has to move.
+CSV_DTYPES = {"Amount": "float32", "Prediction": "int8"}
+
+def _derive(df):
+    # Derived columns are computed once here so they live in the cached
+    # frame and filtered slices get them for free; the callbacks used to
+    # redo these O(N) passes on every tick. Categorical Label lets the
+    # groupbys work on integer codes instead of Python strings.
+    # Prediction's 0/1 values double as the category codes, so no
+    # intermediate string array is ever materialized.
+    df["Label"] = pd.Categorical.from_codes(df["Prediction"].values,
+                                            categories=['Normal', 'Fraud'])
+    df["Hour"] = df["Timestamp"].dt.hour.astype('int8')
+    # Day stays in the datetime64 domain; .dt.date would box every row
+    # into a Python date object.
+    df["Day"] = df["Timestamp"].values.astype('datetime64[D]')
+    return df
+
+def _parse_full(path):
+    try:
+        # The pyarrow engine parses multi-threaded and handles the
+        # Timestamp column in the same pass, so no second
+        # to_datetime sweep is needed.
+        df = pd.read_csv(path, engine='pyarrow', dtype=CSV_DTYPES,
+                         parse_dates=["Timestamp"])
+    except ImportError:
+        df = pd.read_csv(path, dtype=CSV_DTYPES)
+        # Parse each distinct timestamp string once and map the
+        # result back - appended logs repeat the same strings, and
+        # the explicit format skips per-value format inference.
+        uniq = df["Timestamp"].unique()
+        mapping = dict(zip(uniq, pd.to_datetime(uniq, format='%Y-%m-%d %H:%M:%S')))
+        df["Timestamp"] = df["Timestamp"].map(mapping)
+    return _derive(df)
+
+def _parse_tail(chunk):
+    new = pd.read_csv(io.BytesIO(chunk), header=None, dtype=CSV_DTYPES,
+                      names=["TransactionID", "Amount", "Prediction", "Timestamp"])
+    new["Timestamp"] = pd.to_datetime(new["Timestamp"], format='%Y-%m-%d %H:%M:%S')
+    return _derive(new)
+
+# predictions.csv is an append-only log, so after the first full parse
+# each tick only reads the bytes past the last seen offset and concats
+# the new rows onto the cached DataFrame: O(new rows), not O(file).
+_tail_state = {"sig": None, "offset": 0, "df": None}
+
 def load_data():
     if not os.path.exists(DATA_FILE):
         return pd.DataFrame(columns=["TransactionID", "Amount", "Prediction", "Timestamp"])
+    st = os.stat(DATA_FILE)
+    sig = (st.st_mtime_ns, st.st_size)
+    if _tail_state["df"] is not None and sig == _tail_state["sig"]:
+        return _tail_state["df"]
     try:
-        df = pd.read_csv(DATA_FILE)
-        df["Timestamp"] = pd.to_datetime(df["Timestamp"])
-        return df
+        if _tail_state["df"] is None or st.st_size < _tail_state["offset"]:
+            # First load, or the file shrank (rotated or rewritten).
+            df = _parse_full(DATA_FILE)
+            _tail_state["offset"] = st.st_size
+        else:
+            with open(DATA_FILE, 'rb') as f:
+                f.seek(_tail_state["offset"])
+                chunk = f.read()
+            # Only consume complete lines in case a write is in flight.
+            cut = chunk.rfind(b'\n') + 1
+            if cut and chunk[:cut].strip():
+                df = pd.concat([_tail_state["df"], _parse_tail(chunk[:cut])],
+                               ignore_index=True)
+                _tail_state["offset"] += cut
+            else:
+                df = _tail_state["df"]
     except:
+        _tail_state.update(sig=None, offset=0, df=None)
         return pd.DataFrame(columns=["TransactionID", "Amount", "Prediction", "Timestamp"])
+    _tail_state.update(sig=sig, df=df)
+    return df
+
+def _file_sig():
+    if os.path.exists(DATA_FILE):
+        st = os.stat(DATA_FILE)
+        return st.st_mtime_ns, st.st_size
+    return 0, 0
+
+# cache_by on the CSV signature lets the manager hand every client
+# polling the same tick the same cached result. The manager hashes the
+# callback args into the cache key too, so arg 0 - the client-echoed
+# csv-sig, which drifts per session and duplicates cache_by - must be
+# ignored or every poll would be a cache miss that queues its own job.
+_background_kwargs = (
+    dict(background=True, manager=background_callback_manager,
+         cache_by=[_file_sig], cache_args_to_ignore=[0])
+    if background_callback_manager else {}
+)
+
+# Shared by the dashboard and download callbacks; the cache key carries
+# the file signature plus every filter value, so a hit is guaranteed
+# fresh and the date strings are parsed at most once per combination.
+@lru_cache(maxsize=32)
+def _filtered(mtime_ns, size, prediction_value, start_date, end_date):
+    df = load_data()
+    if df.empty:
+        return df
+    # One query() evaluates the whole condition in a single pass
+    # (numexpr-backed when installed) instead of chaining boolean
+    # indexes that each allocate an intermediate frame.
+    exprs = []
+    local = {}
+    if prediction_value != 'All':
+        exprs.append("Prediction == @p")
+        local['p'] = prediction_value
+    if start_date:
+        exprs.append("Timestamp >= @s")
+        local['s'] = pd.to_datetime(start_date)
+    if end_date:
+        exprs.append("Timestamp <= @e")
+        local['e'] = pd.to_datetime(end_date)
+    if exprs:
+        df = df.query(" and ".join(exprs), local_dict=local)
+    return df
+
+# One fused scan produces every Prediction-derived aggregate the render
+# needs: the fraud total, the 24-bucket histograms for the today/
+# yesterday comparison, and the day-by-hour heatmap grid. The separate
+# sum/filter/groupby passes all walked the same column; fusing them
+# keeps the work identical but touches memory once.
+@njit(cache=True)
+def _summarize(epoch_hours, hours, preds, today_h0, days_idx, ndays):
+    fraud = 0
+    out_t = np.zeros(24, np.int64)
+    out_y = np.zeros(24, np.int64)
+    grid = np.zeros((ndays, 24), np.int32)
+    yest_h0 = today_h0 - 24
+    for i in range(preds.shape[0]):
+        if preds[i] == 1:
+            fraud += 1
+            h = epoch_hours[i]
+            if today_h0 <= h < today_h0 + 24:
+                out_t[h - today_h0] += 1
+            elif yest_h0 <= h < yest_h0 + 24:
+                out_y[h - yest_h0] += 1
+            grid[days_idx[i], hours[i]] += 1
+    return fraud, out_t, out_y, grid
+
+# Rolling fraud rate over the trailing window, one O(N) pass with a
+# running sum; pandas .rolling() would box through Python per window.
+@njit(cache=True)
+def _rolling_fraud_rate(preds, window):
+    out = np.empty(preds.shape[0], np.float64)
+    s = 0
+    for i in range(preds.shape[0]):
+        s += preds[i]
+        if i >= window:
+            s -= preds[i - window]
+        out[i] = s / min(i + 1, window)
+    return out
 
 # ---------------------- Layout ---------------------- #
 app.layout = dbc.Container([
@@ -120,6 +300,10 @@ app.layout = dbc.Container([
         ])
     ]),
 
+    dcc.Store(id='data-store'),
+    dcc.Store(id='date-filter-debounced'),
+    dcc.Store(id='csv-sig'),
+
     dcc.Interval(
         id='interval-component',
         interval=5 * 1000,
@@ -129,9 +313,106 @@ app.layout = dbc.Container([
 
 # ---------------------- Callbacks ---------------------- #
 
+# Per-client gate on the interval: each session remembers the CSV
+# signature it last saw, and a steady-state tick returns no_update,
+# which stops the callback chain before any downstream work or payload.
+# mtime_ns exceeds JavaScript's 2^53 integer precision, so it crosses
+# the browser as a string to survive the JSON round-trip losslessly.
 @app.callback(
+    Output('csv-sig', 'data'),
+    Input('interval-component', 'n_intervals'),
+    State('csv-sig', 'data')
+)
+def poll_csv(n, last_seen):
+    mtime_ns, size = _file_sig()
+    sig = [str(mtime_ns), size]
+    if sig == last_seen:
+        return dash.no_update
+    return sig
+
+# Refresh the clientside store when the CSV signature advances; the
+# filter->figure work for the simple count charts then runs in the
+# browser without a server roundtrip.
+@app.callback(
+    Output('data-store', 'data'),
+    Input('csv-sig', 'data')
+)
+def refresh_data_store(sig):
+    df = load_data()
+    if df.empty:
+        return {"pred": [], "ts_ms": []}
+    return {
+        "pred": df["Prediction"].tolist(),
+        "ts_ms": df["Timestamp"].values.astype('datetime64[ms]').astype('int64').tolist(),
+    }
+
+# Fraud/Normal counts for the bar and pie charts are cheap enough to
+# compute in the browser, so dropdown and date-picker changes update
+# them without touching the server.
+app.clientside_callback(
+    """
+    function(data, predFilter, startDate, endDate) {
+        var empty = {data: [], layout: {}};
+        if (!data || !data.pred || data.pred.length === 0) {
+            return [empty, empty];
+        }
+        var startMs = startDate ? Date.parse(startDate) : -Infinity;
+        var endMs = endDate ? Date.parse(endDate) : Infinity;
+        var fraud = 0, normal = 0;
+        for (var i = 0; i < data.pred.length; i++) {
+            var ts = data.ts_ms[i];
+            if (ts < startMs || ts > endMs) continue;
+            if (predFilter !== 'All' && data.pred[i] !== predFilter) continue;
+            if (data.pred[i] === 1) { fraud++; } else { normal++; }
+        }
+        var labels = ['Normal', 'Fraud'];
+        var counts = [normal, fraud];
+        var figTrend = {
+            data: [{type: 'bar', x: labels, y: counts,
+                    marker: {color: ['skyblue', 'crimson']}}],
+            layout: {showlegend: false}
+        };
+        var figPie = {
+            data: [{type: 'pie', labels: labels, values: counts,
+                    marker: {colors: ['skyblue', 'crimson']}}],
+            layout: {}
+        };
+        return [figTrend, figPie];
+    }
+    """,
     Output('fraud-trend', 'figure'),
     Output('fraud-pie', 'figure'),
+    Input('data-store', 'data'),
+    Input('prediction-filter', 'value'),
+    Input('date-filter', 'start_date'),
+    Input('date-filter', 'end_date')
+)
+
+# The date picker fires on every click; debounce it in the browser so
+# only the final value (after 300 ms of quiet) reaches the server
+# callback below.
+app.clientside_callback(
+    """
+    function(startDate, endDate) {
+        return new Promise(function(resolve) {
+            if (window._dateFilterResolve) {
+                clearTimeout(window._dateFilterTimer);
+                window._dateFilterResolve(window.dash_clientside.no_update);
+            }
+            window._dateFilterResolve = resolve;
+            window._dateFilterTimer = setTimeout(function() {
+                window._dateFilterResolve = null;
+                resolve({start: startDate, end: endDate});
+            }, 300);
+        });
+    }
+    """,
+    Output('date-filter-debounced', 'data'),
+    Input('date-filter', 'start_date'),
+    Input('date-filter', 'end_date')
+)
+
+@app.callback(
     Output('fraud-timeline', 'figure'),
     Output('accuracy-display', 'children'),
     Output('transactions-table', 'data'),
@@ -139,46 +420,60 @@ app.layout = dbc.Container([
     Output('trend-comparison', 'figure'),
     Output('fraud-heatmap', 'figure'),
     Output('stats-panel', 'children'),
-    Input('interval-component', 'n_intervals'),
+    Input('csv-sig', 'data'),
     Input('prediction-filter', 'value'),
-    Input('date-filter', 'start_date'),
-    Input('date-filter', 'end_date')
+    Input('date-filter-debounced', 'data'),
+    **_background_kwargs
 )
-def update_dashboard(n, prediction_value, start_date, end_date):
-    df = load_data()
-    if df.empty:
-        return go.Figure(), go.Figure(), go.Figure(), "No data yet", [], None, go.Figure(), go.Figure(), []
-
-    # Filter
-    if prediction_value != 'All':
-        df = df[df["Prediction"] == prediction_value]
-    if start_date:
-        df = df[df["Timestamp"] >= pd.to_datetime(start_date)]
-    if end_date:
-        df = df[df["Timestamp"] <= pd.to_datetime(end_date)]
-
+def update_dashboard(sig, prediction_value, date_range):
+    start_date = (date_range or {}).get('start')
+    end_date = (date_range or {}).get('end')
+    # Only reached when poll_csv saw the file change or a filter moved;
+    # the per-client unchanged-tick check lives up there, outside this
+    # (potentially shared-cached) body. The signature is re-stat'ed
+    # server-side rather than trusted from the client echo, and the
+    # rendered outputs stay memoized on (file state, filters).
+    mtime_ns, size = _file_sig()
+    return _render_dashboard(mtime_ns, size, prediction_value, start_date, end_date)
+
+@lru_cache(maxsize=8)
+def _render_dashboard(mtime_ns, size, prediction_value, start_date, end_date):
+    df = _filtered(mtime_ns, size, prediction_value, start_date, end_date)
     if df.empty:
-        return go.Figure(), go.Figure(), go.Figure(), "No data found for filters.", [], None, go.Figure(), go.Figure(), []
-
-    df["Label"] = df["Prediction"].map({0: 'Normal', 1: 'Fraud'})
-    df["Time"] = df["Timestamp"].dt.strftime('%H:%M:%S')
-
-    # Main Graphs
-    trend = df.groupby('Label').size().reset_index(name='Count')
-    fig_trend = px.bar(trend, x='Label', y='Count', color='Label',
-                       color_discrete_map={'Normal': 'skyblue', 'Fraud': 'crimson'})
-
-    fig_pie = px.pie(trend, values='Count', names='Label', color='Label',
-                     color_discrete_map={'Normal': 'skyblue', 'Fraud': 'crimson'})
-
-    fig_line = px.line(df, x='Time', y='Amount', color='Label', markers=True,
-                       color_discrete_map={'Normal': 'skyblue', 'Fraud': 'crimson'})
+        if load_data().empty:
+            return go.Figure(), "No data yet", [], None, go.Figure(), go.Figure(), []
+        return go.Figure(), "No data found for filters.", [], None, go.Figure(), go.Figure(), []
+
+    # Main Graphs (Scattergl renders via WebGL, which stays interactive
+    # well past the point counts where SVG traces bog down)
+    label_colors = {'Normal': 'skyblue', 'Fraud': 'crimson'}
+    fig_line = go.Figure(data=[
+        go.Scattergl(x=grp['Timestamp'], y=grp['Amount'], mode='lines+markers',
+                     name=lbl, line=dict(color=label_colors[lbl]),
+                     marker=dict(color=label_colors[lbl]))
+        for lbl, grp in df.groupby('Label', observed=True)
+    ])
+    fig_line.update_layout(xaxis_title="Time", yaxis_title="Amount")
+
+    # All Prediction-derived aggregates come out of one fused scan:
+    # fraud total, today/yesterday hourly histograms, heatmap grid.
+    preds = df['Prediction'].values
+    epoch_hours = df['Timestamp'].values.astype('datetime64[h]').astype('int64')
+    today_h0 = int(df['Timestamp'].values.max().astype('datetime64[D]')
+                   .astype('datetime64[h]').astype('int64'))
+    days = df['Day'].values.astype('datetime64[D]')
+    day0 = days.min()
+    ndays = int((days.max() - day0).astype('int64')) + 1
+    fraud_count, today_fraud, yesterday_fraud, heat = _summarize(
+        epoch_hours, df['Hour'].values, preds, today_h0,
+        (days - day0).astype('int64'), ndays)
 
     # Accuracy & Stats
     total = len(df)
-    fraud_count = df["Prediction"].sum()
+    fraud_count = int(fraud_count)
+    normal_count = total - fraud_count
     accuracy = (1 - fraud_count / total) * 100
-    acc_text = f"✅ Model Accuracy: {accuracy:.2f}% ({total - fraud_count} Normal / {fraud_count} Fraud)"
+    acc_text = f"✅ Model Accuracy: {accuracy:.2f}% ({normal_count} Normal / {fraud_count} Fraud)"
 
     stats_cards = dbc.Row([
         dbc.Col(dbc.Card([dbc.CardHeader("🔢 Total Transactions"), dbc.CardBody(f"{total}")], color="light"), md=3),
@@ -187,43 +482,36 @@ def update_dashboard(n, prediction_value, start_date, end_date):
         dbc.Col(dbc.Card([dbc.CardHeader("📊 Fraud %"), dbc.CardBody(f"{(fraud_count / total * 100):.2f}%")], color="warning", inverse=True), md=3),
     ])
 
-    # Table
-    table_data = df.sort_values(by='Timestamp', ascending=False).to_dict('records')
+    # Table (nlargest quickselects the newest rows in O(N) instead of
+    # sorting the whole frame; projection keeps the payload bounded)
+    table_data = df.nlargest(100, 'Timestamp') \
+        [["TransactionID", "Amount", "Prediction", "Timestamp"]].to_dict('records')
 
-    # Alert
+    # Alert on the fraud rate over the most recent transactions rather
+    # than the all-time ratio, which gets sluggish as the log grows.
     alert_box = None
-    if fraud_count / total >= 0.3:
+    rates = _rolling_fraud_rate(preds, ALERT_WINDOW)
+    if rates[-1] >= ALERT_THRESHOLD:
         alert_box = dbc.Alert("🚨 High fraud activity detected!", color="danger", className="text-center")
 
     # Today vs Yesterday Trend
-    today = df['Timestamp'].max().date()
-    yesterday = today - timedelta(days=1)
-
-    today_data = df[df["Timestamp"].dt.date == today]
-    yesterday_data = df[df["Timestamp"].dt.date == yesterday]
-
-    today_fraud = today_data[today_data['Prediction'] == 1].resample('H', on='Timestamp').size()
-    yesterday_fraud = yesterday_data[yesterday_data['Prediction'] == 1].resample('H', on='Timestamp').size()
-
+    hours_axis = np.arange(24)
     fig_compare = go.Figure()
-    fig_compare.add_trace(go.Scatter(x=today_fraud.index, y=today_fraud.values, mode='lines+markers', name="Today"))
-    fig_compare.add_trace(go.Scatter(x=yesterday_fraud.index, y=yesterday_fraud.values, mode='lines+markers', name="Yesterday"))
-    fig_compare.update_layout(title="Today vs Yesterday - Hourly Fraud Comparison", xaxis_title="Time", yaxis_title="Fraud Count")
+    fig_compare.add_trace(go.Scatter(x=hours_axis, y=today_fraud, mode='lines+markers', name="Today"))
+    fig_compare.add_trace(go.Scatter(x=hours_axis, y=yesterday_fraud, mode='lines+markers', name="Yesterday"))
+    fig_compare.update_layout(title="Today vs Yesterday - Hourly Fraud Comparison", xaxis_title="Hour of Day", yaxis_title="Fraud Count")
 
     # Heatmap
-    df['Hour'] = df['Timestamp'].dt.hour
-    df['Day'] = df['Timestamp'].dt.date
-    heatmap_data = df[df['Prediction'] == 1].groupby(['Day', 'Hour']).size().unstack(fill_value=0)
-    fig_heatmap = go.Figure(data=go.Heatmap(
-        z=heatmap_data.values,
-        x=heatmap_data.columns,
-        y=heatmap_data.index.astype(str),
+    fig_heatmap = go.Figure(data=go.Heatmapgl(
+        z=heat,
+        x=np.arange(24),
+        y=(day0 + np.arange(ndays)).astype(str),
         colorscale='YlOrRd',
         colorbar=dict(title="Fraud Count")
     ))
     fig_heatmap.update_layout(title="Fraud Activity Heatmap", xaxis_title="Hour of Day", yaxis_title="Date")
 
-    return fig_trend, fig_pie, fig_line, acc_text, table_data, alert_box, fig_compare, fig_heatmap, stats_cards
+    return fig_line, acc_text, table_data, alert_box, fig_compare, fig_heatmap, stats_cards
 
 # ---------------------- Download ---------------------- #
 @app.callback(
@@ -235,17 +523,15 @@ def update_dashboard(n, prediction_value, start_date, end_date):
     prevent_initial_call=True
 )
 def download_report(n_clicks, prediction_value, start_date, end_date):
-    df = load_data()
-    if prediction_value != 'All':
-        df = df[df["Prediction"] == prediction_value]
-    if start_date:
-        df = df[df["Timestamp"] >= pd.to_datetime(start_date)]
-    if end_date:
-        df = df[df["Timestamp"] <= pd.to_datetime(end_date)]
+    mtime_ns, size = _file_sig()
+    df = _filtered(mtime_ns, size, prediction_value, start_date, end_date)
 
+    # Serialize straight to memory; writing a temp file to disk just to
+    # hand it to send_file left stale report CSVs piling up.
+    buf = io.BytesIO()
+    df.to_csv(buf, index=False)
     file_name = f"fraud_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-    df.to_csv(file_name, index=False)
-    return dcc.send_file(file_name)
+    return dcc.send_bytes(buf.getvalue(), file_name)
 
 # ---------------------- Run ---------------------- #
 if __name__ == '__main__':